@@ -6,9 +6,16 @@ setup(
     packages=find_packages(),
     install_requires=[
         "tweepy",
-        "pytest",
-        "pytest-mock",
+        "orjson",
+        "requests",
+        "requests-oauthlib",
     ],
+    extras_require={
+        "dev": [
+            "pytest",
+            "pytest-mock",
+        ],
+    },
     entry_points={
         'console_scripts': [
             'socialmedia-cli=socialmedia_cli.cli:main'
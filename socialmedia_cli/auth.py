@@ -2,12 +2,13 @@
 Authentication module for social media platforms.
 """
 
-import json
+import errno
 import os
-import time
+import socket
+import tempfile
 from pathlib import Path
 from typing import Dict, Tuple
-import tweepy
+import orjson
 from urllib.parse import parse_qs, urlparse
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import threading
@@ -18,10 +19,38 @@ TOKEN_PATH = Path.home() / ".socialmedia_cli_tokens.json"
 TOKEN_MODE = 0o600
 CALLBACK_PORT = 8000
 CALLBACK_URL = f"http://localhost:{CALLBACK_PORT}/callback"
+AUTH_TIMEOUT = 120  # seconds to wait for the OAuth callback
+SMOKE_TEST_ENV = "SOCIALMEDIA_CLI_SMOKE_TEST"
+
+CREDENTIALS_HELP = f"""
+To use Twitter, you need to set up API credentials:
+1. Go to https://developer.twitter.com/en/portal/dashboard
+2. Create a new app or use an existing one
+3. Get your API Key (Consumer Key) and API Secret (Consumer Secret)
+4. In User authentication settings:
+   - Enable OAuth 1.0a
+   - Set callback URL to: {CALLBACK_URL}
+
+Then set them as environment variables:
+export TWITTER_CONSUMER_KEY='your_consumer_key'
+export TWITTER_CONSUMER_SECRET='your_consumer_secret'
+
+Or enter them now (they will be used only for this session):"""
+
+SUCCESS_HTML = """
+    <html>
+        <body style="text-align: center; font-family: Arial, sans-serif; margin-top: 50px;">
+            <h1 style="color: #1DA1F2;">Authentication Successful!</h1>
+            <p>You can close this window and return to the terminal.</p>
+        </body>
+    </html>
+""".encode('utf-8')
+SUCCESS_HTML_LENGTH = str(len(SUCCESS_HTML))
 
 class OAuthCallbackHandler(BaseHTTPRequestHandler):
     """Handle OAuth callback and store the verifier."""
     verifier = None
+    verifier_event = threading.Event()
     
     def do_GET(self):
         """Handle GET request to callback URL."""
@@ -30,21 +59,19 @@ class OAuthCallbackHandler(BaseHTTPRequestHandler):
             query = parse_qs(urlparse(self.path).query)
             OAuthCallbackHandler.verifier = query.get('oauth_verifier', [None])[0]
             
-            # Send success response
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            
-            # HTML response
-            html = """
-                <html>
-                    <body style="text-align: center; font-family: Arial, sans-serif; margin-top: 50px;">
-                        <h1 style="color: #1DA1F2;">Authentication Successful!</h1>
-                        <p>You can close this window and return to the terminal.</p>
-                    </body>
-                </html>
-            """
-            self.wfile.write(html.encode('utf-8'))
+            # Send success response; close the connection so the browser
+            # doesn't hold it open while we shut the server down
+            try:
+                self.send_response(200)
+                self.send_header('Content-type', 'text/html')
+                self.send_header('Content-Length', SUCCESS_HTML_LENGTH)
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.wfile.write(SUCCESS_HTML)
+            finally:
+                # Wake login only once the page is written (it may exit right
+                # away), but still wake it if the browser went away mid-write
+                OAuthCallbackHandler.verifier_event.set()
         else:
             self.send_error(404)
 
@@ -54,30 +81,74 @@ def get_twitter_credentials() -> tuple[str, str]:
     consumer_secret = os.environ.get("TWITTER_CONSUMER_SECRET")
     
     if not consumer_key or not consumer_secret:
-        print("\nTo use Twitter, you need to set up API credentials:")
-        print("1. Go to https://developer.twitter.com/en/portal/dashboard")
-        print("2. Create a new app or use an existing one")
-        print("3. Get your API Key (Consumer Key) and API Secret (Consumer Secret)")
-        print("4. In User authentication settings:")
-        print(f"   - Enable OAuth 1.0a")
-        print(f"   - Set callback URL to: {CALLBACK_URL}")
-        print("\nThen set them as environment variables:")
-        print("export TWITTER_CONSUMER_KEY='your_consumer_key'")
-        print("export TWITTER_CONSUMER_SECRET='your_consumer_secret'")
-        print("\nOr enter them now (they will be used only for this session):")
+        print(CREDENTIALS_HELP)
         consumer_key = input("Enter your Twitter API Key (Consumer Key): ").strip()
         consumer_secret = input("Enter your Twitter API Secret (Consumer Secret): ").strip()
     
     return consumer_key, consumer_secret
 
-def start_callback_server() -> HTTPServer:
+class CallbackServer(HTTPServer):
+    """Local HTTP server that serves until the OAuth callback arrives or it is stopped."""
+
+    def __init__(self, server_address):
+        super().__init__(server_address, OAuthCallbackHandler)
+        self.stopping = False
+        self.thread = threading.Thread(target=self.serve_until_callback, daemon=True)
+
+    def serve_until_callback(self) -> None:
+        """Handle requests one at a time until the OAuth callback has arrived."""
+        while not OAuthCallbackHandler.verifier_event.is_set() and not self.stopping:
+            self.handle_request()
+
+    def stop(self) -> None:
+        """Wake the serve loop, wait for it to exit, then close the socket."""
+        self.stopping = True
+        if self.thread.is_alive():
+            # handle_request blocks in poll until a connection arrives, and
+            # closing the socket does not wake it; connect to ourselves so the
+            # loop returns and sees the stop flag.
+            try:
+                socket.create_connection(self.server_address[:2], timeout=1).close()
+            except OSError:
+                pass
+            self.thread.join(timeout=5)
+        self.server_close()
+
+def start_callback_server() -> CallbackServer:
     """Start a local server to handle the OAuth callback."""
-    server = HTTPServer(('localhost', CALLBACK_PORT), OAuthCallbackHandler)
-    thread = threading.Thread(target=server.serve_forever)
-    thread.daemon = True
-    thread.start()
+    # Binding is the readiness check: once the constructor returns, the
+    # socket is listening and the callback can be accepted.
+    try:
+        server = CallbackServer(('localhost', CALLBACK_PORT))
+    except OSError as e:
+        if e.errno == errno.EADDRINUSE:
+            raise Exception(f"Callback port {CALLBACK_PORT} is already in use: {e}") from e
+        raise Exception(f"Could not start callback server on port {CALLBACK_PORT}: {e}") from e
+    server.thread.start()
     return server
 
+def save_tokens(tokens: Dict) -> None:
+    """
+    Atomically write tokens to TOKEN_PATH with TOKEN_MODE permissions.
+    
+    The file is written to a temporary file in the same directory, which
+    mkstemp creates owner-only before any secrets are written, then renamed
+    into place so the token file is never partially written or world-readable.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=TOKEN_PATH.parent, prefix=".tok", suffix=".json")
+    try:
+        # Wrap the fd first so it is closed even if fchmod fails
+        with os.fdopen(fd, "wb") as f:
+            # mkstemp already creates the file as 0600; fchmod only pins TOKEN_MODE
+            # explicitly where available (Windows lacks it before Python 3.13)
+            if hasattr(os, "fchmod"):
+                os.fchmod(f.fileno(), TOKEN_MODE)
+            f.write(orjson.dumps(tokens, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_path, TOKEN_PATH)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
 def login(platform: str) -> None:
     """
     Authenticate with the specified social media platform.
@@ -91,6 +162,9 @@ def login(platform: str) -> None:
     """
     if platform != "twitter":
         raise ValueError(f"Unsupported platform: {platform}")
+
+    # Imported here so commands that never log in skip tweepy's import cost
+    import tweepy
     
     try:
         # Get Twitter API credentials
@@ -105,26 +179,29 @@ def login(platform: str) -> None:
         
         try:
             # Start callback server
+            OAuthCallbackHandler.verifier = None
+            OAuthCallbackHandler.verifier_event.clear()
             print("\nStarting local server to handle authentication...")
             server = start_callback_server()
+            try:
+                # Get request token and authorization URL
+                redirect_url = auth.get_authorization_url()
+                print(f"\nOpening browser for Twitter authorization...")
+                # Launch the browser in the background so we start waiting immediately
+                threading.Thread(target=webbrowser.open, args=(redirect_url,), daemon=True).start()
+                
+                print("\nWaiting for Twitter callback...")
+                # Block until the callback arrives or we time out
+                got_callback = OAuthCallbackHandler.verifier_event.wait(AUTH_TIMEOUT)
+            finally:
+                # Stop the serve loop and close the listening socket, also when
+                # the request token fails or the wait is interrupted (Ctrl-C)
+                server.stop()
             
-            # Get request token and authorization URL
-            redirect_url = auth.get_authorization_url()
-            print(f"\nOpening browser for Twitter authorization...")
-            webbrowser.open(redirect_url)
-            
-            print("\nWaiting for Twitter callback...")
-            # Wait for callback with timeout
-            timeout = 120  # 2 minutes
-            start_time = time.time()
-            while not OAuthCallbackHandler.verifier:
-                if time.time() - start_time > timeout:
-                    server.shutdown()
-                    raise Exception("Authentication timed out. Please try again.")
-                time.sleep(1)
-            
-            # Shutdown server
-            server.shutdown()
+            if not got_callback:
+                raise Exception("Authentication timed out. Please try again.")
+            if not OAuthCallbackHandler.verifier:
+                raise Exception("Authorization was denied or no verifier was returned.")
             
             # Exchange for access token
             auth.get_access_token(OAuthCallbackHandler.verifier)
@@ -139,24 +216,21 @@ def login(platform: str) -> None:
                 }
             }
             
-            with open(TOKEN_PATH, "w") as f:
-                json.dump(tokens, f, indent=2)
-            os.chmod(TOKEN_PATH, TOKEN_MODE)
+            save_tokens(tokens)
             
             print(f"\n✅ Authentication successful!")
             print(f"Tokens saved to {TOKEN_PATH}")
             
-            # Wait and run smoke test
-            print("\nWaiting 60 seconds before running a test post...")
-            time.sleep(60)
-            print("Posting test tweet...")
-            
-            try:
-                tweet_id, tweet_url = twitter.post_tweet("Hello to my workld!!")
-                print(f"✅ Test successful! Tweet posted: {tweet_url}")
-            except Exception as e:
-                print(f"⚠️  Test post failed: {e}")
-                print("You can still try posting manually with: socialmedia-cli post twitter 'your message'")
+            # Optional smoke test, only when explicitly set to "1"; the access
+            # token is usable immediately
+            if os.environ.get(SMOKE_TEST_ENV) == "1":
+                print("\nPosting test tweet...")
+                try:
+                    tweet_id, tweet_url = twitter.post_tweet("Hello to my workld!!")
+                    print(f"✅ Test successful! Tweet posted: {tweet_url}")
+                except Exception as e:
+                    print(f"⚠️  Test post failed: {e}")
+                    print("You can still try posting manually with: socialmedia-cli post twitter 'your message'")
                 
         except tweepy.TweepyException as e:
             raise Exception(f"Failed to complete authentication: {e}")
@@ -12,8 +12,8 @@ class CustomArgumentParser(argparse.ArgumentParser):
         self.print_usage(sys.stderr)
         self.exit(1, f"error: {message}\n")
 
-def main(args: Optional[list[str]] = None) -> int:
-    """Main entry point for the CLI."""
+def _build_parser() -> CustomArgumentParser:
+    """Build the argument parser with all subcommands."""
     parser = CustomArgumentParser(description="Post to social media platforms from the command line")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
@@ -26,6 +26,20 @@ def main(args: Optional[list[str]] = None) -> int:
     post_parser.add_argument("platform", help="Platform to post to (e.g., twitter)")
     post_parser.add_argument("message", help="Message to post")
 
+    return parser
+
+_PARSER: Optional[CustomArgumentParser] = None
+
+def _get_parser() -> CustomArgumentParser:
+    """Return the argument parser, building it on first use."""
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = _build_parser()
+    return _PARSER
+
+def main(args: Optional[list[str]] = None) -> int:
+    """Main entry point for the CLI."""
+    parser = _get_parser()
     parsed_args = parser.parse_args(args)
 
     if not parsed_args.command:
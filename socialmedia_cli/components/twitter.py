@@ -2,12 +2,56 @@
 Twitter-specific API wrapper.
 """
 
-import json
 from pathlib import Path
-from typing import Tuple
-from requests_oauthlib import OAuth1Session
+from typing import TYPE_CHECKING, List, Tuple
+import orjson
+
+if TYPE_CHECKING:
+    from requests_oauthlib import OAuth1Session
 
 TOKEN_PATH = Path.home() / ".socialmedia_cli_tokens.json"
+POOL_MAXSIZE = 8
+
+_REQUIRED_TOKEN_KEYS = frozenset(("access_token", "access_token_secret", "consumer_key", "consumer_secret"))
+
+# Parsed token file, keyed by path and stat fields so a fresh login invalidates
+# it; inode and size catch rewrites that land within the mtime granularity
+_TOKEN_CACHE: dict = {}
+# One OAuth1Session per credential pair so posts reuse the connection pool
+_SESSION_CACHE: dict = {}
+
+
+def _load_tokens() -> dict:
+    """Return the parsed token file, re-reading it only when it changes."""
+    try:
+        st = TOKEN_PATH.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Token file not found: {TOKEN_PATH}") from None
+    key = (TOKEN_PATH, st.st_mtime_ns, st.st_ino, st.st_size)
+    if _TOKEN_CACHE.get("key") != key:
+        _TOKEN_CACHE["tokens"] = orjson.loads(TOKEN_PATH.read_bytes())
+        _TOKEN_CACHE["key"] = key
+    return _TOKEN_CACHE["tokens"]
+
+
+def _get_session(t: dict) -> "OAuth1Session":
+    """Return a cached OAuth1Session for the given Twitter credentials."""
+    key = (t["consumer_key"], t["consumer_secret"], t["access_token"], t["access_token_secret"])
+    session = _SESSION_CACHE.get(key)
+    if session is None:
+        # Imported here so commands that never post skip the requests import cost
+        from requests.adapters import HTTPAdapter
+        from requests_oauthlib import OAuth1Session
+
+        session = OAuth1Session(
+            t["consumer_key"],
+            client_secret=t["consumer_secret"],
+            resource_owner_key=t["access_token"],
+            resource_owner_secret=t["access_token_secret"]
+        )
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE))
+        _SESSION_CACHE[key] = session
+    return session
 
 
 def post_tweet(text: str) -> Tuple[str, str]:
@@ -24,25 +68,16 @@ def post_tweet(text: str) -> Tuple[str, str]:
         FileNotFoundError: If token file is missing
         ValueError: If tokens are invalid or revoked
     """
-    if not TOKEN_PATH.exists():
-        raise FileNotFoundError(f"Token file not found: {TOKEN_PATH}")
-    with open(TOKEN_PATH) as f:
-        tokens = json.load(f)
+    tokens = _load_tokens()
     if "twitter" not in tokens:
         raise ValueError("No Twitter tokens found in token file.")
     t = tokens["twitter"]
-    required_keys = ["access_token", "access_token_secret", "consumer_key", "consumer_secret"]
-    if not all(k in t for k in required_keys):
+    if not _REQUIRED_TOKEN_KEYS.issubset(t):
         raise ValueError("Twitter token file is missing required keys.")
     
     try:
-        # Initialize OAuth1Session with stored credentials
-        oauth = OAuth1Session(
-            t["consumer_key"],
-            client_secret=t["consumer_secret"],
-            resource_owner_key=t["access_token"],
-            resource_owner_secret=t["access_token_secret"]
-        )
+        # Reuse the OAuth1Session for these credentials
+        oauth = _get_session(t)
 
         # Prepare the tweet payload
         payload = {"text": text}
@@ -53,11 +88,15 @@ def post_tweet(text: str) -> Tuple[str, str]:
             json=payload
         )
 
-        if response.status_code != 201:
-            raise ValueError(f"Request returned an error: {response.status_code} {response.text}")
+        # Read the body and hand the connection back to the session's pool
+        try:
+            if response.status_code != 201:
+                raise ValueError(f"Request returned an error: {response.status_code} {response.text}")
+            json_response = response.json()
+        finally:
+            response.close()
 
         # Parse the response
-        json_response = response.json()
         if not json_response or 'data' not in json_response:
             raise ValueError("Invalid response from Twitter API")
 
@@ -72,4 +111,49 @@ def post_tweet(text: str) -> Tuple[str, str]:
 
     except Exception as e:
         print(f"Error posting tweet: {str(e)}")
-        raise ValueError(f"Failed to post tweet: {str(e)}") 
\ No newline at end of file
+        raise ValueError(f"Failed to post tweet: {str(e)}")
+
+
+class BatchPostError(ValueError):
+    """
+    Raised by post_tweets when one post in the batch fails.
+    
+    Attributes:
+        results: (tweet_id, tweet_url) tuples for the texts posted before the failure
+        failed_index: Index into texts of the post that failed
+    """
+
+    def __init__(self, message: str, results: List[Tuple[str, str]], failed_index: int):
+        super().__init__(message)
+        self.results = results
+        self.failed_index = failed_index
+
+
+def post_tweets(texts: List[str]) -> List[Tuple[str, str]]:
+    """
+    Post several tweets in order by calling post_tweet for each text.
+    
+    Each call re-checks the token file and prints its own result; posts share
+    the cached OAuth1Session, so they reuse its pooled connection. Posting
+    stops at the first failure.
+    
+    Args:
+        texts: The tweet texts to post, in order
+        
+    Returns:
+        List of (tweet_id, tweet_url) tuples, one per posted tweet
+        
+    Raises:
+        BatchPostError: If a post fails or the token file goes missing; its
+            results attribute holds the tweets already posted, so a retry
+            should resume from failed_index
+    """
+    results = []
+    for index, text in enumerate(texts):
+        try:
+            results.append(post_tweet(text))
+        except (ValueError, FileNotFoundError) as e:
+            raise BatchPostError(
+                f"Failed to post tweet {index + 1} of {len(texts)}: {e}", results, index
+            ) from e
+    return results
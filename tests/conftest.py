@@ -0,0 +1,85 @@
+"""
+Shared pytest fixtures.
+"""
+
+import copy
+import json
+from types import SimpleNamespace
+import pytest
+from unittest import mock
+from socialmedia_cli import auth
+from socialmedia_cli.components import twitter
+
+
+# Contents of a complete token file, shared by the fixtures below
+VALID_TWITTER_TOKENS = {
+    "twitter": {
+        "access_token": "atoken",
+        "access_token_secret": "asecret",
+        "consumer_key": "ckey",
+        "consumer_secret": "csecret"
+    }
+}
+
+
+@pytest.fixture
+def valid_twitter_token_data():
+    """Return a fresh copy of VALID_TWITTER_TOKENS that a test may modify."""
+    return copy.deepcopy(VALID_TWITTER_TOKENS)
+
+
+@pytest.fixture(scope="session")
+def valid_twitter_tokens(tmp_path_factory):
+    """Write a complete Twitter token file once per session and return its path."""
+    token_path = tmp_path_factory.mktemp("tokens") / "tokens.json"
+    token_path.write_text(json.dumps(VALID_TWITTER_TOKENS))
+    return token_path
+
+
+@pytest.fixture(autouse=True)
+def oauth_session(monkeypatch):
+    """
+    Replace OAuth1Session with a mock so no test can reach the Twitter API.
+    
+    Returns the mocked class; its return_value is the session, whose post()
+    answers with a 201 for tweet id 12345 unless a test overrides it.
+    """
+    response = mock.Mock(status_code=201)
+    response.json.return_value = {"data": {"id": "12345"}}
+    session_cls = mock.Mock()
+    session_cls.return_value.post.return_value = response
+    monkeypatch.setattr("requests_oauthlib.OAuth1Session", session_cls)
+    monkeypatch.setattr(twitter, "_SESSION_CACHE", {})
+    return session_cls
+
+
+@pytest.fixture
+def twitter_login_env(tmp_path, monkeypatch):
+    """
+    Patch everything auth.login("twitter") touches outside the process.
+    
+    Consumer keys come from the environment, tokens go to a temp file, the
+    callback server immediately "receives" verifier123, and the smoke test
+    is off unless a test sets auth.SMOKE_TEST_ENV. Returns a namespace with
+    the mocked OAuth handler, the token path and the mocked post_tweet.
+    """
+    monkeypatch.setenv("TWITTER_CONSUMER_KEY", "ckey")
+    monkeypatch.setenv("TWITTER_CONSUMER_SECRET", "csecret")
+    monkeypatch.delenv(auth.SMOKE_TEST_ENV, raising=False)
+    token_path = tmp_path / ".socialmedia_cli_tokens.json"
+    monkeypatch.setattr(auth, "TOKEN_PATH", token_path)
+    handler = mock.Mock()
+    handler.get_authorization_url.return_value = "http://auth.url"
+    handler.get_access_token.return_value = None
+    handler.access_token = "atoken"
+    handler.access_token_secret = "asecret"
+    monkeypatch.setattr("tweepy.OAuth1UserHandler", mock.Mock(return_value=handler))
+    def fake_start_callback_server():
+        auth.OAuthCallbackHandler.verifier = "verifier123"
+        auth.OAuthCallbackHandler.verifier_event.set()
+        return mock.Mock()
+    monkeypatch.setattr(auth, "start_callback_server", fake_start_callback_server)
+    monkeypatch.setattr(auth.webbrowser, "open", mock.Mock())
+    post_tweet = mock.Mock(return_value=("12345", "https://twitter.com/user/status/12345"))
+    monkeypatch.setattr(auth.twitter, "post_tweet", post_tweet)
+    return SimpleNamespace(handler=handler, token_path=token_path, post_tweet=post_tweet)
@@ -2,45 +2,36 @@
 Tests for the authentication module.
 """
 
+import errno
 import json
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
 from pathlib import Path
 import pytest
-import builtins
 from unittest import mock
 from socialmedia_cli import auth
 
-def test_unsupported_platform():
+# The real function, kept before twitter_login_env replaces it
+_start_callback_server = auth.start_callback_server
+
+def test_unsupported_platform(monkeypatch):
     """Test that unsupported platforms raise ValueError."""
+    # Make any tweepy import fail, so the check must come first
+    monkeypatch.setitem(sys.modules, "tweepy", None)
     with pytest.raises(ValueError, match="Unsupported platform"):
         auth.login("facebook")
 
-def test_twitter_login_flow(tmp_path, monkeypatch):
+def test_twitter_login_flow(twitter_login_env, monkeypatch):
     """Test the full Twitter login flow, including token file and smoke test."""
-    # Patch environment for consumer keys
-    monkeypatch.setenv("TWITTER_CONSUMER_KEY", "ckey")
-    monkeypatch.setenv("TWITTER_CONSUMER_SECRET", "csecret")
-    # Patch token path to temp
-    token_path = tmp_path / ".socialmedia_cli_tokens.json"
-    monkeypatch.setattr(auth, "TOKEN_PATH", token_path)
-    # Patch Tweepy OAuth handler
-    mock_handler = mock.Mock()
-    mock_handler.get_authorization_url.return_value = "http://auth.url"
-    mock_handler.get_access_token.return_value = None
-    mock_handler.access_token = "atoken"
-    mock_handler.access_token_secret = "asecret"
-    monkeypatch.setattr(auth.tweepy, "OAuth1UserHandler", mock.Mock(return_value=mock_handler))
-    # Patch input to simulate user entering verifier
-    monkeypatch.setattr(builtins, "input", lambda _: "verifier123")
-    # Patch os.chmod to do nothing
-    monkeypatch.setattr(auth.os, "chmod", lambda *a, **kw: None)
-    # Patch time.sleep to avoid real delay
-    monkeypatch.setattr(auth.time, "sleep", lambda s: None)
-    # Patch smoke test post_tweet
-    smoke_result = ("12345", "https://twitter.com/user/status/12345")
-    monkeypatch.setattr(auth.twitter, "post_tweet", mock.Mock(return_value=smoke_result))
+    # Opt in to the post-login smoke test
+    monkeypatch.setenv(auth.SMOKE_TEST_ENV, "1")
     # Run login
     auth.login("twitter")
     # Check token file written
+    token_path = twitter_login_env.token_path
     with open(token_path) as f:
         tokens = json.load(f)
     assert "twitter" in tokens
@@ -49,5 +40,148 @@ def test_twitter_login_flow(tmp_path, monkeypatch):
     assert t["access_token_secret"] == "asecret"
     assert t["consumer_key"] == "ckey"
     assert t["consumer_secret"] == "csecret"
+    assert token_path.stat().st_mode & 0o777 == auth.TOKEN_MODE
+    twitter_login_env.handler.get_access_token.assert_called_with("verifier123")
     # Check smoke test was called
-    auth.twitter.post_tweet.assert_called_with("Hello to my workld!!") 
\ No newline at end of file
+    twitter_login_env.post_tweet.assert_called_with("Hello to my workld!!")
+
+def test_twitter_login_skips_smoke_test_by_default(twitter_login_env):
+    """Test that login does not post a test tweet unless opted in."""
+    auth.login("twitter")
+    twitter_login_env.post_tweet.assert_not_called()
+
+def test_twitter_login_skips_smoke_test_when_disabled(twitter_login_env, monkeypatch):
+    """Test that setting the smoke-test variable to "0" does not post a test tweet."""
+    monkeypatch.setenv(auth.SMOKE_TEST_ENV, "0")
+    auth.login("twitter")
+    twitter_login_env.post_tweet.assert_not_called()
+
+def test_twitter_login_timeout(twitter_login_env, monkeypatch):
+    """Test that login gives up when no callback arrives within AUTH_TIMEOUT."""
+    monkeypatch.setattr(auth, "AUTH_TIMEOUT", 0)
+    # A callback server that never receives the redirect
+    monkeypatch.setattr(auth, "start_callback_server", mock.Mock())
+    with pytest.raises(Exception, match="timed out"):
+        auth.login("twitter")
+    twitter_login_env.handler.get_access_token.assert_not_called()
+    assert not twitter_login_env.token_path.exists()
+
+def test_twitter_login_timeout_stops_real_server(twitter_login_env, monkeypatch):
+    """Test that a timed-out login stops the serve thread and frees the port."""
+    monkeypatch.setattr(auth, "AUTH_TIMEOUT", 0.1)
+    monkeypatch.setattr(auth, "CALLBACK_PORT", 0)
+    monkeypatch.setattr(auth, "start_callback_server", _start_callback_server)
+    servers = []
+    class RecordingServer(auth.CallbackServer):
+        def __init__(self, server_address):
+            super().__init__(server_address)
+            servers.append(self)
+    monkeypatch.setattr(auth, "CallbackServer", RecordingServer)
+    with pytest.raises(Exception, match="timed out"):
+        auth.login("twitter")
+    server, = servers
+    assert not server.thread.is_alive()
+    # The port must be free for a second login in the same process
+    auth.HTTPServer(("localhost", server.server_address[1]), auth.OAuthCallbackHandler).server_close()
+
+def test_twitter_login_request_token_error_stops_real_server(twitter_login_env, monkeypatch):
+    """Test that a failing get_authorization_url still stops the server and frees the port."""
+    import tweepy
+    monkeypatch.setattr(auth, "CALLBACK_PORT", 0)
+    monkeypatch.setattr(auth, "start_callback_server", _start_callback_server)
+    twitter_login_env.handler.get_authorization_url.side_effect = tweepy.TweepyException("boom")
+    servers = []
+    class RecordingServer(auth.CallbackServer):
+        def __init__(self, server_address):
+            super().__init__(server_address)
+            servers.append(self)
+    monkeypatch.setattr(auth, "CallbackServer", RecordingServer)
+    with pytest.raises(Exception, match="boom"):
+        auth.login("twitter")
+    server, = servers
+    assert not server.thread.is_alive()
+    auth.HTTPServer(("localhost", server.server_address[1]), auth.OAuthCallbackHandler).server_close()
+
+def test_start_callback_server_port_in_use(monkeypatch):
+    """Test that EADDRINUSE is reported as the callback port being in use."""
+    error = OSError(errno.EADDRINUSE, "Address already in use")
+    monkeypatch.setattr(auth, "CallbackServer", mock.Mock(side_effect=error))
+    with pytest.raises(Exception, match="already in use") as e:
+        auth.start_callback_server()
+    assert e.value.__cause__ is error
+
+def test_start_callback_server_other_bind_error(monkeypatch):
+    """Test that bind errors other than EADDRINUSE are not reported as in use."""
+    error = OSError(errno.EACCES, "Permission denied")
+    monkeypatch.setattr(auth, "CallbackServer", mock.Mock(side_effect=error))
+    with pytest.raises(Exception, match="Could not start callback server") as e:
+        auth.start_callback_server()
+    assert "in use" not in str(e.value)
+    assert e.value.__cause__ is error
+
+def test_save_tokens_replaces_file_atomically(tmp_path, monkeypatch):
+    """Test that save_tokens overwrites the token file without leaving temp files."""
+    token_path = tmp_path / ".socialmedia_cli_tokens.json"
+    token_path.write_text("{}")
+    monkeypatch.setattr(auth, "TOKEN_PATH", token_path)
+    auth.save_tokens({"twitter": {"access_token": "atoken"}})
+    assert json.loads(token_path.read_text()) == {"twitter": {"access_token": "atoken"}}
+    assert token_path.stat().st_mode & 0o777 == auth.TOKEN_MODE
+    assert [p.name for p in tmp_path.iterdir()] == [token_path.name]
+
+def test_get_twitter_credentials_prompts_when_unset(monkeypatch, capsys):
+    """Test that missing env credentials print setup help and prompt for them."""
+    monkeypatch.delenv("TWITTER_CONSUMER_KEY", raising=False)
+    monkeypatch.delenv("TWITTER_CONSUMER_SECRET", raising=False)
+    answers = iter([" ckey ", " csecret "])
+    monkeypatch.setattr("builtins.input", lambda _: next(answers))
+    assert auth.get_twitter_credentials() == ("ckey", "csecret")
+    out, err = capsys.readouterr()
+    assert auth.CALLBACK_URL in out
+    assert "export TWITTER_CONSUMER_KEY" in out
+
+def test_callback_handler_stores_verifier(monkeypatch):
+    """Test that the callback handler records the verifier and serves the success page."""
+    monkeypatch.setattr(auth.OAuthCallbackHandler, "verifier", None)
+    monkeypatch.setattr(auth.OAuthCallbackHandler, "verifier_event", threading.Event())
+    server = auth.CallbackServer(("localhost", 0))
+    thread = server.thread
+    thread.start()
+    port = server.server_address[1]
+    # A stray request before the callback must not end the serve loop
+    with pytest.raises(urllib.error.HTTPError):
+        urllib.request.urlopen(f"http://localhost:{port}/favicon.ico")
+    with urllib.request.urlopen(f"http://localhost:{port}/callback?oauth_verifier=v123") as resp:
+        body = resp.read()
+        assert resp.headers["Content-Length"] == auth.SUCCESS_HTML_LENGTH
+        assert resp.headers["Connection"] == "close"
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    server.stop()
+    assert body == auth.SUCCESS_HTML
+    assert auth.OAuthCallbackHandler.verifier == "v123"
+    assert auth.OAuthCallbackHandler.verifier_event.is_set()
+
+def test_save_tokens_without_fchmod(tmp_path, monkeypatch):
+    """Test that save_tokens still writes an owner-only file where os.fchmod is missing."""
+    token_path = tmp_path / ".socialmedia_cli_tokens.json"
+    monkeypatch.setattr(auth, "TOKEN_PATH", token_path)
+    monkeypatch.delattr(auth.os, "fchmod")
+    auth.save_tokens({"twitter": {"access_token": "atoken"}})
+    assert json.loads(token_path.read_text()) == {"twitter": {"access_token": "atoken"}}
+    assert token_path.stat().st_mode & 0o777 == auth.TOKEN_MODE
+
+def test_save_tokens_fchmod_error_cleans_up(tmp_path, monkeypatch):
+    """Test that a failing fchmod closes and removes the temp file."""
+    token_path = tmp_path / ".socialmedia_cli_tokens.json"
+    monkeypatch.setattr(auth, "TOKEN_PATH", token_path)
+    fds = []
+    def failing_fchmod(fd, mode):
+        fds.append(fd)
+        raise PermissionError("fchmod denied")
+    monkeypatch.setattr(auth.os, "fchmod", failing_fchmod, raising=False)
+    with pytest.raises(PermissionError):
+        auth.save_tokens({"twitter": {"access_token": "atoken"}})
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(OSError):
+        os.fstat(fds[0])
@@ -2,35 +2,30 @@
 Tests for the CLI interface.
 """
 
-import subprocess
 from pathlib import Path
 import pytest
 from unittest import mock
 from socialmedia_cli import cli
 
 
-def test_cli_help():
+def test_cli_help(capsys):
     """Test that --help shows available commands."""
-    result = subprocess.run(
-        ["socialmedia-cli", "--help"],
-        capture_output=True,
-        text=True
-    )
-    assert result.returncode == 0
-    assert "login" in result.stdout
-    assert "post" in result.stdout
+    with pytest.raises(SystemExit) as e:
+        cli.main(["--help"])
+    out, err = capsys.readouterr()
+    assert e.value.code == 0
+    assert "login" in out
+    assert "post" in out
 
 
-def test_invalid_command():
+def test_invalid_command(capsys):
     """Test that invalid commands exit with code 1 and print a usage hint."""
-    result = subprocess.run(
-        ["socialmedia-cli", "invalid"],
-        capture_output=True,
-        text=True
-    )
-    assert result.returncode == 1
-    assert "usage:" in result.stderr
-    assert "invalid choice" in result.stderr or "error:" in result.stderr
+    with pytest.raises(SystemExit) as e:
+        cli.main(["invalid"])
+    out, err = capsys.readouterr()
+    assert e.value.code == 1
+    assert "usage:" in err
+    assert "invalid choice" in err or "error:" in err
 
 
 def test_login_command(monkeypatch, capsys):
@@ -50,4 +45,15 @@ def test_post_command(monkeypatch, capsys):
     exit_code = cli.main(["post", "twitter", "Hello!"])
     out, err = capsys.readouterr()
     assert exit_code == 0
-    cli.api.post.assert_called_with("twitter", "Hello!") 
\ No newline at end of file
+    cli.api.post.assert_called_with("twitter", "Hello!")
+
+
+def test_parser_is_built_once(monkeypatch):
+    """Test that repeated cli.main() calls reuse the cached parser."""
+    monkeypatch.setattr(cli, "_PARSER", None)
+    build = mock.Mock(wraps=cli._build_parser)
+    monkeypatch.setattr(cli, "_build_parser", build)
+    monkeypatch.setattr(cli.api, "post", mock.Mock())
+    cli.main(["post", "twitter", "one"])
+    cli.main(["post", "twitter", "two"])
+    assert build.call_count == 1
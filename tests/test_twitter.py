@@ -3,71 +3,123 @@ Tests for the Twitter component.
 """
 
 import json
+import os
+from pathlib import Path
 import pytest
 from unittest import mock
 from socialmedia_cli.components import twitter
 
-def test_post_tweet_no_token_file(tmp_path, monkeypatch):
-    """Test that posting a tweet without a token file raises FileNotFoundError."""
-    # Patch TOKEN_PATH to a temp location that does not exist
-    monkeypatch.setattr(twitter, "TOKEN_PATH", tmp_path / "no_token.json")
-    with pytest.raises(FileNotFoundError):
-        twitter.post_tweet("Test tweet")
+_MISSING_TOKEN_PATH = Path("/definitely/does/not/exist/tokens.json")
 
-def test_post_tweet_success(tmp_path, monkeypatch):
-    """Test posting a tweet with valid tokens returns (id, url)."""
-    # Write valid tokens
-    token_path = tmp_path / "tokens.json"
-    tokens = {
-        "twitter": {
-            "access_token": "atoken",
-            "access_token_secret": "asecret",
-            "consumer_key": "ckey",
-            "consumer_secret": "csecret"
-        }
-    }
-    token_path.write_text(json.dumps(tokens))
-    monkeypatch.setattr(twitter, "TOKEN_PATH", token_path)
-    # Mock tweepy
-    mock_status = mock.Mock()
-    mock_status.id = 12345
-    mock_api = mock.Mock()
-    mock_api.update_status.return_value = mock_status
-    monkeypatch.setattr(twitter.tweepy, "OAuth1UserHandler", mock.Mock())
-    monkeypatch.setattr(twitter.tweepy, "API", mock.Mock(return_value=mock_api))
+def test_post_tweet(valid_twitter_tokens, oauth_session, monkeypatch):
+    """Test posting a tweet with a valid token file."""
+    monkeypatch.setattr(twitter, "TOKEN_PATH", valid_twitter_tokens)
     tweet_id, tweet_url = twitter.post_tweet("Hello!")
     assert tweet_id == "12345"
     assert tweet_url == "https://twitter.com/user/status/12345"
-    mock_api.update_status.assert_called_with("Hello!")
+    oauth_session.return_value.post.assert_called_with("https://api.twitter.com/2/tweets", json={"text": "Hello!"})
+
+def test_post_tweet_no_token_file(monkeypatch):
+    """Test that a missing token file raises FileNotFoundError without the stat error as context."""
+    monkeypatch.setattr(twitter, "TOKEN_PATH", _MISSING_TOKEN_PATH)
+    with pytest.raises(FileNotFoundError, match="Token file not found") as e:
+        twitter.post_tweet("Hello!")
+    assert e.value.__suppress_context__
 
-def test_post_tweet_invalid_tokens(tmp_path, monkeypatch):
-    """Test that invalid tokens raise ValueError."""
-    # Write incomplete tokens
+@pytest.mark.parametrize("tokens,match", [
+    ({}, "No Twitter tokens found"),
+    ({"twitter": {"access_token": "atoken"}}, "missing required keys"),
+], ids=["no_twitter_section", "missing_keys"])
+def test_post_tweet_invalid_tokens(tmp_path, oauth_session, monkeypatch, tokens, match):
+    """Test that incomplete token files raise ValueError before any request."""
     token_path = tmp_path / "tokens.json"
-    tokens = {"twitter": {"access_token": "atoken"}}  # missing keys
     token_path.write_text(json.dumps(tokens))
     monkeypatch.setattr(twitter, "TOKEN_PATH", token_path)
-    with pytest.raises(ValueError, match="missing required keys"):
+    with pytest.raises(ValueError, match=match):
         twitter.post_tweet("Hello!")
+    oauth_session.return_value.post.assert_not_called()
 
-def test_post_tweet_tweepy_error(tmp_path, monkeypatch):
-    """Test that Tweepy errors are raised as ValueError."""
-    # Write valid tokens
+def test_post_tweet_request_error(valid_twitter_tokens, oauth_session, monkeypatch):
+    """Test that a failed request is reported as ValueError."""
+    monkeypatch.setattr(twitter, "TOKEN_PATH", valid_twitter_tokens)
+    oauth_session.return_value.post.side_effect = ConnectionError("fail")
+    with pytest.raises(ValueError, match="Failed to post tweet"):
+        twitter.post_tweet("Hello!")
+
+def test_post_tweet_reuses_session(tmp_path, valid_twitter_token_data, oauth_session, monkeypatch):
+    """Test that repeated posts reuse one session and re-read tokens only on change."""
     token_path = tmp_path / "tokens.json"
-    tokens = {
-        "twitter": {
-            "access_token": "atoken",
-            "access_token_secret": "asecret",
-            "consumer_key": "ckey",
-            "consumer_secret": "csecret"
-        }
-    }
-    token_path.write_text(json.dumps(tokens))
+    token_path.write_text(json.dumps(valid_twitter_token_data))
     monkeypatch.setattr(twitter, "TOKEN_PATH", token_path)
-    # Mock tweepy to raise
-    monkeypatch.setattr(twitter.tweepy, "OAuth1UserHandler", mock.Mock())
-    mock_api = mock.Mock()
-    mock_api.update_status.side_effect = twitter.tweepy.TweepyException("fail")
-    monkeypatch.setattr(twitter.tweepy, "API", mock.Mock(return_value=mock_api))
-    with pytest.raises(ValueError, match="Failed to post tweet"):
-        twitter.post_tweet("fail!") 
\ No newline at end of file
+    twitter.post_tweet("one")
+    twitter.post_tweet("two")
+    assert oauth_session.call_count == 1
+    assert oauth_session.return_value.post.call_count == 2
+    # Rewriting the token file must invalidate the cached tokens
+    valid_twitter_token_data["twitter"]["access_token"] = "rotated"
+    token_path.write_text(json.dumps(valid_twitter_token_data))
+    os.utime(token_path, ns=(0, 0))
+    twitter.post_tweet("three")
+    assert oauth_session.call_count == 2
+    assert oauth_session.call_args.kwargs["resource_owner_key"] == "rotated"
+
+def test_post_tweet_rereads_tokens_with_same_mtime(tmp_path, valid_twitter_token_data, oauth_session, monkeypatch):
+    """Test that a token rewrite within the mtime granularity still invalidates the cache."""
+    token_path = tmp_path / "tokens.json"
+    token_path.write_text(json.dumps(valid_twitter_token_data))
+    monkeypatch.setattr(twitter, "TOKEN_PATH", token_path)
+    twitter.post_tweet("one")
+    mtime_ns = token_path.stat().st_mtime_ns
+    valid_twitter_token_data["twitter"]["access_token"] = "rotated-token"
+    token_path.write_text(json.dumps(valid_twitter_token_data))
+    os.utime(token_path, ns=(mtime_ns, mtime_ns))
+    twitter.post_tweet("two")
+    assert oauth_session.call_args.kwargs["resource_owner_key"] == "rotated-token"
+
+def test_post_tweets_batch(valid_twitter_tokens, oauth_session, monkeypatch):
+    """Test that post_tweets posts each text over a single pooled session."""
+    monkeypatch.setattr(twitter, "TOKEN_PATH", valid_twitter_tokens)
+    responses = []
+    for tweet_id in ("1", "2"):
+        response = mock.Mock(status_code=201)
+        response.json.return_value = {"data": {"id": tweet_id}}
+        responses.append(response)
+    oauth_session.return_value.post.side_effect = responses
+    results = twitter.post_tweets(["first", "second"])
+    assert results == [
+        ("1", "https://twitter.com/user/status/1"),
+        ("2", "https://twitter.com/user/status/2"),
+    ]
+    assert oauth_session.call_count == 1
+    oauth_session.return_value.mount.assert_called_once()
+    for response in responses:
+        response.close.assert_called_once()
+
+def test_post_tweets_keeps_results_before_failure(valid_twitter_tokens, oauth_session, monkeypatch):
+    """Test that a failed post in a batch reports the tweets already posted."""
+    monkeypatch.setattr(twitter, "TOKEN_PATH", valid_twitter_tokens)
+    ok = mock.Mock(status_code=201)
+    ok.json.return_value = {"data": {"id": "1"}}
+    oauth_session.return_value.post.side_effect = [ok, ConnectionError("fail"), ok]
+    with pytest.raises(twitter.BatchPostError, match="tweet 2 of 3") as e:
+        twitter.post_tweets(["first", "second", "third"])
+    assert e.value.results == [("1", "https://twitter.com/user/status/1")]
+    assert e.value.failed_index == 1
+    assert oauth_session.return_value.post.call_count == 2
+
+def test_post_tweets_token_file_removed_mid_batch(tmp_path, valid_twitter_token_data, oauth_session, monkeypatch):
+    """Test that a token file deleted mid-batch still reports the tweets already posted."""
+    token_path = tmp_path / "tokens.json"
+    token_path.write_text(json.dumps(valid_twitter_token_data))
+    monkeypatch.setattr(twitter, "TOKEN_PATH", token_path)
+    ok = mock.Mock(status_code=201)
+    ok.json.return_value = {"data": {"id": "1"}}
+    def post_then_remove(*args, **kwargs):
+        token_path.unlink()
+        return ok
+    oauth_session.return_value.post.side_effect = post_then_remove
+    with pytest.raises(twitter.BatchPostError, match="tweet 2 of 2") as e:
+        twitter.post_tweets(["first", "second"])
+    assert isinstance(e.value.__cause__, FileNotFoundError)
+    assert e.value.results == [("1", "https://twitter.com/user/status/1")]
+    assert e.value.failed_index == 1